@@ -2,12 +2,30 @@
 FastAPI application instance with all endpoints registered.
 """
 
-import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from . import health, root, apply, docs, exception_handlers
-from .middleware import OriginCheckMiddleware
+from ..config import get_settings
+from ..utils.http import close_http_session
+from ..utils.logger import start_logging, stop_logging
+from ..utils.tools.playwright import stop_playwright
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: start process-wide resources on startup and
+    release them on shutdown.
+    """
+    start_logging()
+    yield
+    await stop_playwright()
+    await close_http_session()
+    stop_logging()
+
 
 # FastAPI application instance
 app = FastAPI(
@@ -17,11 +35,12 @@ app = FastAPI(
     docs_url=None,
     redoc_url=None,
     openapi_url=None,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Environment-aware CORS configuration
-env = os.getenv("ENVIRONMENT", "development").lower()
-if env == "production":
+if get_settings().is_production:
     # Restrict to cloud.stapply.ai in production
     allowed_origins = [
         "https://cloud.stapply.ai",
@@ -39,9 +58,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add origin check middleware for production
-app.add_middleware(OriginCheckMiddleware)
-
 # Register routers
 app.include_router(root.router)
 app.include_router(health.router)
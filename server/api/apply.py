@@ -2,9 +2,9 @@
 Apply endpoint for job application agent.
 """
 
-import os
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException, status
+from ..config import get_settings
 from ..utils.profile import default_profile
 from ..utils.browser import start_agent
 from .models import ApplyRequest
@@ -19,8 +19,7 @@ def get_default_webhook_url() -> str:
     Returns:
         Webhook URL for the current environment
     """
-    env = os.getenv("ENVIRONMENT", "development").lower()
-    if env == "production":
+    if get_settings().is_production:
         return "https://cloud.stapply.ai/webhook/applications"
     return "http://localhost:3000/webhook/applications"
 
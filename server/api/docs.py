@@ -2,12 +2,14 @@
 Documentation endpoint.
 """
 
-from pathlib import Path
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, Response
+from .static_pages import StaticPage
 
 router = APIRouter()
 
+_DOCS_PAGE = StaticPage("docs.html")
+
 
 @router.get(
     "/docs",
@@ -15,13 +17,13 @@ router = APIRouter()
     description="Interactive API documentation",
     tags=["General"],
     response_class=HTMLResponse,
+    include_in_schema=False,
 )
-async def docs() -> str:
+async def docs(request: Request) -> Response:
     """
     API documentation page.
 
     Returns:
         HTML page with comprehensive API documentation
     """
-    html_path = Path(__file__).parent / "templates" / "docs.html"
-    return html_path.read_text()
+    return _DOCS_PAGE.response(request)
@@ -2,28 +2,30 @@
 Global exception handlers.
 """
 
-from datetime import datetime
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
-from .models import ErrorResponse
+from fastapi.responses import ORJSONResponse
+from ..utils.timestamps import iso_now
 
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> ORJSONResponse:
     """
     Global HTTP exception handler.
 
+    The body follows the ErrorResponse schema but is built as a plain dict
+    to skip model validation and model_dump on the error path.
+
     Args:
         request: The request object
         exc: The HTTP exception
 
     Returns:
-        JSONResponse: Formatted error response
+        ORJSONResponse: Formatted error response
     """
-    error_response = ErrorResponse(
-        error=exc.detail,
-        detail=f"HTTP {exc.status_code} error occurred",
-        timestamp=datetime.utcnow(),
-    )
-    return JSONResponse(
-        status_code=exc.status_code, content=error_response.model_dump()
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "detail": f"HTTP {exc.status_code} error occurred",
+            "timestamp": iso_now(),
+        },
     )
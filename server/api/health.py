@@ -2,14 +2,35 @@
 Health check endpoint.
 """
 
+import re
 import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import APIRouter, status
 from fastapi.responses import HTMLResponse
+from ..config import get_settings
 
 router = APIRouter()
 
+# Split the template once at import into alternating static segments and
+# placeholder names, so rendering is a single join instead of four replaces
+_TEMPLATE = (Path(__file__).parent / "templates" / "health.html").read_text()
+_TEMPLATE_PARTS = re.split(
+    r"\{\{\s*(status|version|timestamp|response_time)\s*\}\}", _TEMPLATE
+)
+
+
+# Rendered page is reused for HEALTH_CACHE_TTL seconds so frequent pollers
+# (load balancers, uptime checks) collapse into one render per window
+_CACHE_TTL = get_settings().health_cache_ttl
+_cache: dict = {"body": None, "exp": 0.0}
+
+
+def _render(values: dict[str, str]) -> str:
+    return "".join(
+        values[part] if i % 2 else part for i, part in enumerate(_TEMPLATE_PARTS)
+    )
+
 
 @router.get(
     "/health",
@@ -18,28 +39,47 @@ router = APIRouter()
     description="Check if the service is running and healthy",
     tags=["Health"],
     response_class=HTMLResponse,
+    include_in_schema=False,
 )
-async def health_check() -> str:
+async def health_check() -> HTMLResponse:
     """
     Health check endpoint with visual dashboard.
 
     Returns:
         HTML page with service health status
     """
+    now = time.monotonic()
+    if _cache["body"] is not None and now < _cache["exp"]:
+        return _cached_response("HIT")
+
     start_time = time.time()
-    
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     status_value = "Healthy"
     version = "1.0.0"
-    
+
     response_time = round((time.time() - start_time) * 1000, 2)
-    
-    html_path = Path(__file__).parent / "templates" / "health.html"
-    html_content = html_path.read_text()
-    
-    html_content = html_content.replace("{{ status }}", status_value)
-    html_content = html_content.replace("{{ version }}", version)
-    html_content = html_content.replace("{{ timestamp }}", timestamp)
-    html_content = html_content.replace("{{ response_time }}", str(response_time))
-    
-    return html_content
+
+    _cache["body"] = _render(
+        {
+            "status": status_value,
+            "version": version,
+            "timestamp": timestamp,
+            "response_time": str(response_time),
+        }
+    )
+    _cache["exp"] = now + _CACHE_TTL
+
+    return _cached_response("MISS")
+
+
+def _cached_response(cache_status: str) -> HTMLResponse:
+    return HTMLResponse(
+        content=_cache["body"],
+        headers={
+            # Cached in-process only; a liveness probe must not be served
+            # from an intermediary's cache
+            "Cache-Control": "no-store",
+            "X-Cache": cache_status,
+        },
+    )
@@ -4,7 +4,7 @@ Pydantic models for type safety.
 
 from datetime import datetime
 from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field, field_serializer
+from pydantic import BaseModel, Field
 
 
 class HealthResponse(BaseModel):
@@ -14,10 +14,6 @@ class HealthResponse(BaseModel):
     timestamp: datetime = Field(..., description="Current timestamp")
     version: str = Field(..., description="API version")
 
-    @field_serializer("timestamp")
-    def serialize_timestamp(self, value: datetime) -> str:
-        return value.isoformat()
-
 
 class ErrorResponse(BaseModel):
     """Error response model."""
@@ -26,10 +22,6 @@ class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Error details")
     timestamp: datetime = Field(..., description="Error timestamp")
 
-    @field_serializer("timestamp")
-    def serialize_timestamp(self, value: datetime) -> str:
-        return value.isoformat()
-
 
 class ApplyRequest(BaseModel):
     """Request body for starting the agent application flow."""
@@ -2,25 +2,28 @@
 Root endpoint.
 """
 
-from pathlib import Path
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, Response
+from .static_pages import StaticPage
 
 router = APIRouter()
 
+_HOME_PAGE = StaticPage("home.html")
+
+
 @router.get(
     "/",
     summary="Root Endpoint",
     description="Welcome page and API information",
     tags=["General"],
     response_class=HTMLResponse,
+    include_in_schema=False,
 )
-async def root() -> str:
+async def root(request: Request) -> Response:
     """
     Root endpoint with API home page.
 
     Returns:
         HTML page with API information
     """
-    html_path = Path(__file__).parent / "templates" / "home.html"
-    return html_path.read_text()
+    return _HOME_PAGE.response(request)
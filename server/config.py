@@ -0,0 +1,77 @@
+"""
+Process-wide configuration, read from the environment once at startup.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Immutable snapshot of the environment the server was started with."""
+
+    environment: str
+    anchor_api_key: Optional[str]
+    webhook_secret: Optional[str]
+    cf_account_id: Optional[str]
+    s3_access_key_id: Optional[str]
+    s3_secret_access_key: Optional[str]
+    health_cache_ttl: float
+    log_level: str
+    ffmpeg_concurrency: int
+
+    @property
+    def is_production(self) -> bool:
+        return self.environment == "production"
+
+
+def _log_level(value: str) -> str:
+    """
+    Validate LOG_LEVEL, falling back to WARNING so a typo can't stop the
+    logger setup (and the app) at import.
+    """
+    level = value.upper()
+    if level in logging.getLevelNamesMapping():
+        return level
+
+    logging.getLogger(__name__).warning(
+        "Invalid LOG_LEVEL %r, using WARNING", value
+    )
+    return "WARNING"
+
+
+def _default_ffmpeg_concurrency() -> int:
+    """
+    Half the CPU count across the whole server. Each uvicorn worker is its own
+    process with its own limit, so the budget is split between them.
+    """
+    workers = int(os.getenv("UVICORN_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1")
+    return max(1, (os.cpu_count() or 1) // 2 // max(1, workers))
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the cached settings, reading the environment on first call.
+    """
+    return Settings(
+        environment=os.getenv("ENVIRONMENT", "development").lower(),
+        anchor_api_key=os.getenv("ANCHOR_API_KEY"),
+        webhook_secret=os.getenv("WEBHOOK_SECRET"),
+        cf_account_id=os.getenv("CF_ACCOUNT_ID"),  # e.g. 'abc123def4567890'
+        s3_access_key_id=os.getenv("S3_ACCESS_KEY_ID"),
+        s3_secret_access_key=os.getenv("S3_SECRET_ACCESS_KEY"),
+        health_cache_ttl=float(os.getenv("HEALTH_CACHE_TTL", "5")),
+        log_level=_log_level(os.getenv("LOG_LEVEL") or "WARNING"),
+        # Concurrent ffmpeg encodes per worker process
+        ffmpeg_concurrency=int(
+            os.getenv("FFMPEG_CONCURRENCY") or _default_ffmpeg_concurrency()
+        ),
+    )
@@ -7,4 +7,15 @@ from .api.app import app
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8080, log_level="info")
+    # uvloop and httptools ship with uvicorn[standard]; pin them explicitly
+    # rather than relying on auto-detection
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8080,
+        loop="uvloop",
+        http="httptools",
+        backlog=2048,
+        timeout_keep_alive=30,
+        log_level="info",
+    )
@@ -1,14 +1,16 @@
 import asyncio
+import contextlib
 import os
-import hmac
-import hashlib
 import time
 import subprocess
 import shutil
 import tempfile
-from typing import Dict, Any, Optional
+import uuid
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Any, Optional
 
 import aiohttp
+import orjson
 from dotenv import load_dotenv
 
 from browser_use import Agent, BrowserSession
@@ -16,38 +18,116 @@ from browser_use.llm import ChatGoogle, ChatGroq, ChatBrowserUse, ChatOpenAI
 
 from anchorbrowser import Anchorbrowser
 
+from ..config import get_settings
 from .profile import default_profile
-from .tools.playwright import playwright_tools, connect_playwright_to_cdp
+from .tools.playwright import (
+    playwright_tools,
+    connect_playwright_to_cdp,
+    disconnect_playwright,
+)
 from .resume import download_resume, cleanup_resume
+from .http import get_http_session
+from .logger import get_logger
+from .webhook import hmac_template
 from .prompt import default_prompt
 
 import boto3
+from botocore.config import Config
 
 load_dotenv()
 
-ACCOUNT_ID = os.getenv("CF_ACCOUNT_ID")  # e.g. 'abc123def4567890'
-R2_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
-R2_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+logger = get_logger("browser")
+
+settings = get_settings()
+
+ACCOUNT_ID = settings.cf_account_id
+R2_ACCESS_KEY_ID = settings.s3_access_key_id
+R2_SECRET_ACCESS_KEY = settings.s3_secret_access_key
 R2_BUCKET = "recordings"
 
+# Created once here rather than checked on every agent completion
+RESULTS_DIR = "prod_results"
+os.makedirs(RESULTS_DIR, exist_ok=True)
+
+# Encoded once so signing a webhook doesn't re-encode the secret every time
+WEBHOOK_SECRET_BYTES = (settings.webhook_secret or "").encode("utf-8")
+if not WEBHOOK_SECRET_BYTES:
+    logger.warning("WEBHOOK_SECRET not set, webhooks will be sent unsigned")
+# Keyed once, as the secret is fixed at import; each signature copies it
+WEBHOOK_HMAC = hmac_template(WEBHOOK_SECRET_BYTES) if WEBHOOK_SECRET_BYTES else None
+
+# Headers sent with every webhook; never mutated, signed requests merge
+# their signature headers into a new dict
+WEBHOOK_BASE_HEADERS = {"Content-Type": "application/json"}
+
+# Recordings are moved in parts of this size; R2 needs at least 5 MiB for
+# every multipart part but the last
+RECORDING_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
+# Parts in flight to R2 at once; also bounds memory to this many chunks
+RECORDING_UPLOAD_CONCURRENCY = 4
+# Recordings up to this size are uploaded with a single PUT
+RECORDING_SINGLE_PUT_THRESHOLD = 16 * 1024 * 1024  # 16 MiB
+
+# Frame rate of the processed clip
+RECORDING_FPS = 30
+
+# libx264 already uses every core, so encodes beyond this just contend for
+# CPU; further replays wait their turn. Per worker process, see
+# Settings.ffmpeg_concurrency
+FFMPEG_CONCURRENCY = settings.ffmpeg_concurrency
+_ffmpeg_slots = asyncio.Semaphore(FFMPEG_CONCURRENCY)
+
+# Strong references to in-flight agent runs. The event loop only keeps weak
+# references to tasks, so an unreferenced fire-and-forget task can be garbage
+# collected before it finishes.
+_background_tasks: set[asyncio.Task] = set()
+
+
+@lru_cache(maxsize=1)
+def get_anchor_client() -> Anchorbrowser:
+    """
+    Get the process-wide Anchor client, so its HTTP connection pool and
+    auth setup are shared across agent runs.
+    """
+    return Anchorbrowser(api_key=get_settings().anchor_api_key)
+
+
+@lru_cache(maxsize=1)
+def get_r2_client():
+    """
+    Get the process-wide R2 (S3 API) client. Building a boto3 client loads
+    and parses the service model, so it is done once; clients are thread-safe
+    and shared by every upload's worker threads.
+    """
+    return boto3.client(
+        "s3",
+        endpoint_url=f"https://{ACCOUNT_ID}.r2.cloudflarestorage.com",
+        aws_access_key_id=R2_ACCESS_KEY_ID,
+        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+        region_name="auto",
+        config=Config(
+            max_pool_connections=50,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+
 
-def generate_webhook_signature(payload: str, secret: str) -> str:
+def generate_webhook_signature(payload: bytes) -> str:
     """
     Generate HMAC-SHA256 signature for webhook payload.
 
     Args:
-        payload: The JSON payload as string
-        secret: The webhook secret key
+        payload: The JSON payload, exactly as sent in the request body
 
     Returns:
         Hex-encoded signature
     """
-    if not secret:
+    if WEBHOOK_HMAC is None:
         raise ValueError("Webhook secret is required for signing")
 
-    signature = hmac.new(
-        secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256
-    ).hexdigest()
+    mac = WEBHOOK_HMAC.copy()
+    mac.update(payload)
+    signature = mac.hexdigest()
 
     return f"sha256={signature}"
 
@@ -83,11 +163,11 @@ def get_llm_provider(model: Optional[str] = None):
     
     if provider == "openai":
         model_name = "/".join(parts[1:])
-        print(f"🤖 Using OpenAI model: {model_name}")
+        logger.info("Using OpenAI model: %s", model_name)
         return ChatOpenAI(model=model_name)
     elif provider == "google":
         model_name = "/".join(parts[1:])
-        print(f"🤖 Using Google model: {model_name}")
+        logger.info("Using Google model: %s", model_name)
         return ChatGoogle(model=model_name)
     elif provider == "groq":
         # Groq format: groq/modelprovider/modelname
@@ -98,7 +178,7 @@ def get_llm_provider(model: Optional[str] = None):
                 f"(e.g., 'groq/anthropic/claude-3.5-sonnet')"
             )
         model_name = "/".join(parts[1:])
-        print(f"🤖 Using Groq model: {model_name}")
+        logger.info("Using Groq model: %s", model_name)
         return ChatGroq(model=model_name)
     else:
         raise ValueError(
@@ -113,7 +193,7 @@ async def send_webhook(
     session_id: str,
     success: bool,
     agent_result: Dict[str, Any],
-    cost_metadata: Dict[str, Any],
+    cost_metadata: Optional[Dict[str, Any]] = None,
 ):
     """
     Send webhook notification when agent completes.
@@ -123,7 +203,8 @@ async def send_webhook(
         user_id: User ID of the agent
         session_id: Session ID of the agent
         success: Success status of the agent
-        metadata: Additional metadata to include in the webhook
+        agent_result: Result or error details to include in the webhook
+        cost_metadata: Token usage and cost of the run, if it got that far
     """
     if not webhook_url:
         return
@@ -137,52 +218,53 @@ async def send_webhook(
         "timestamp": int(time.time()),
     }
 
-    # Convert payload to JSON string for signing
-    import json
-
-    payload_json = json.dumps(payload, sort_keys=True)
+    # Serialize once to bytes; the same bytes are signed and sent, so key
+    # order doesn't matter to receivers verifying the raw body
+    payload_json = orjson.dumps(payload)
 
     # Generate signature
-    webhook_secret = os.getenv("WEBHOOK_SECRET")
-    headers = {"Content-Type": "application/json"}
-
-    if webhook_secret:
-        signature = generate_webhook_signature(payload_json, webhook_secret)
-        headers["X-Webhook-Signature"] = signature
-        headers["X-Webhook-Timestamp"] = str(payload["timestamp"])
+    if WEBHOOK_SECRET_BYTES:
+        signature = generate_webhook_signature(payload_json)
+        headers = WEBHOOK_BASE_HEADERS | {
+            "X-Webhook-Signature": signature,
+            "X-Webhook-Timestamp": str(payload["timestamp"]),
+        }
     else:
-        print("⚠️ Warning: WEBHOOK_SECRET not set, sending unsigned webhook")
+        headers = WEBHOOK_BASE_HEADERS
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                webhook_url,
-                data=payload_json,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-                if response.status == 200:
-                    print(f"✅ Webhook sent successfully to {webhook_url}")
-                else:
-                    response_text = await response.text()
-                    print(
-                        f"⚠️ Webhook failed with status {response.status}: {response_text[:200]}..."
-                    )
+        # Shared session keeps connections to the webhook host alive
+        session = get_http_session()
+        async with session.post(
+            webhook_url,
+            data=payload_json,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as response:
+            if response.status == 200:
+                logger.info("Webhook sent successfully to %s", webhook_url)
+            else:
+                response_text = await response.text()
+                logger.warning(
+                    "Webhook failed with status %s: %s...",
+                    response.status,
+                    response_text[:200],
+                )
     except aiohttp.ClientConnectorError as e:
-        print(f"⚠️ Could not connect to webhook URL {webhook_url}: {e}")
-    except aiohttp.ClientTimeout as e:
-        print(f"⚠️ Webhook request timed out for {webhook_url}: {e}")
+        logger.warning("Could not connect to webhook URL %s: %s", webhook_url, e)
+    except asyncio.TimeoutError as e:
+        logger.warning("Webhook request timed out for %s: %s", webhook_url, e)
     except Exception as e:
-        print(f"❌ Error sending webhook to {webhook_url}: {e}")
+        logger.error("Error sending webhook to %s: %s", webhook_url, e)
 
 
 async def start_agent(
     user_id: str,
     url: str,
-    profile: dict = default_profile,
+    profile: Optional[dict] = None,
     resume_url: str = "",
     instructions: str = "",
-    secrets: dict = {},
+    secrets: Optional[dict] = None,
     webhook_url: Optional[str] = None,
     model: Optional[str] = None,
 ) -> str:
@@ -196,22 +278,26 @@ async def start_agent(
     if not url:
         raise ValueError("URL is required")
 
+    if profile is None:
+        profile = default_profile
+
     if not profile:
         raise ValueError("Profile is required")
 
     if not resume_url:
         raise ValueError("Resume URL or file path is required")
 
-    # Initialize Anchor client and create browser session
-    anchor_client = Anchorbrowser(api_key=os.getenv("ANCHOR_API_KEY"))
-    session = anchor_client.sessions.create(
+    # Create browser session with the shared Anchor client
+    anchor_client = get_anchor_client()
+    session = await asyncio.to_thread(
+        anchor_client.sessions.create,
         browser={"headless": {"active": False}},
     )
 
     session_id = session.data.id
 
     # Start the agent process in the background
-    asyncio.create_task(
+    task = asyncio.create_task(
         _run_agent_background(
             anchor_client,
             session,
@@ -226,6 +312,8 @@ async def start_agent(
             model,
         )
     )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
     # Return session_id immediately
     return session_id, session.data.live_view_url
@@ -239,7 +327,7 @@ async def _run_agent_background(
     profile: dict,
     resume_url: str,
     instructions: str,
-    secrets: dict,
+    secrets: Optional[dict],
     webhook_url: Optional[str],
     session_id: str,
     model: Optional[str] = None,
@@ -248,16 +336,41 @@ async def _run_agent_background(
     Run the agent in the background and send webhook when complete.
     """
     file_path = None
+    playwright_connected = False
+    # The webhook is delivered concurrently with result persistence and
+    # cleanup (including the replay upload) and awaited at the very end
+    webhook_task = None
 
     try:
+        # The resume download doesn't depend on the browser, so run it
+        # concurrently with the Playwright connection
+        resume_task = None
         if resume_url:
             # The resume url will always be from usfs, so we can safely download it
-            file_path = download_resume(resume_url)
+            resume_task = asyncio.create_task(download_resume(resume_url))
+
+        # Connect Playwright to the browser
+        try:
+            playwright_connected = await connect_playwright_to_cdp(
+                session.data.cdp_url
+            )
+        except BaseException:
+            # Don't orphan the download: stop it, and keep its path if it
+            # already finished so the cleanup below still removes the file
+            if resume_task:
+                resume_task.cancel()
+                (downloaded,) = await asyncio.gather(
+                    resume_task, return_exceptions=True
+                )
+                if isinstance(downloaded, str):
+                    file_path = downloaded
+            raise
+
+        if resume_task:
+            file_path = await resume_task
 
         prompt = default_prompt(url, profile, file_path, instructions)
 
-        # Connect Playwright to the browser
-        playwright_connected = await connect_playwright_to_cdp(session.data.cdp_url)
         if not playwright_connected:
             raise Exception(
                 "Failed to connect Playwright to browser. File uploads will not work."
@@ -305,36 +418,37 @@ async def _run_agent_background(
             else "Unknown",
         }
 
-        # Write the result to a file (prod_results/result_<timestamp>.json)
-        import json
-
-        # Check if the directory exists
-        if not os.path.exists("prod_results"):
-            # If it doesn't exist, create it
-            os.makedirs("prod_results")
-
-        with open(f"prod_results/result_{time.time()}.json", "w") as f:
-            json.dump(
-                {
-                    "agent_result": agent_result,
-                    "cost_metadata": cost_metadata,
-                },
-                f,
-                indent=2,
+        # Send webhook notification
+        webhook_task = asyncio.create_task(
+            send_webhook(
+                webhook_url,
+                user_id,
+                session_id,
+                result.is_successful(),
+                agent_result,
+                cost_metadata,
             )
+        )
 
-        # Send webhook notification
-        await send_webhook(
-            webhook_url,
-            user_id,
-            session_id,
-            result.is_successful(),
-            agent_result,
-            cost_metadata,
+        # Write the result to a file (prod_results/result_<timestamp>_<id>.json)
+        result_json = orjson.dumps(
+            {
+                "agent_result": agent_result,
+                "cost_metadata": cost_metadata,
+            },
+            option=orjson.OPT_INDENT_2,
+        )
+        await asyncio.to_thread(
+            _write_bytes_to_file,
+            # The random suffix keeps runs finishing in the same second apart
+            os.path.join(
+                RESULTS_DIR, f"result_{int(time.time())}_{uuid.uuid4().hex[:8]}.json"
+            ),
+            result_json,
         )
 
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.error("Agent run failed: %s", e)
 
         # Send webhook notification for failure
         error_metadata = {
@@ -342,35 +456,59 @@ async def _run_agent_background(
             "user_id": user_id,
             "url": url,
         }
-        await send_webhook(webhook_url, user_id, session_id, False, error_metadata)
+        if webhook_task is None:
+            webhook_task = asyncio.create_task(
+                send_webhook(webhook_url, user_id, session_id, False, error_metadata)
+            )
         raise
 
     finally:
+        # Deleting the Anchor session and disconnecting Playwright are
+        # independent, so run them concurrently
+        cleanup_steps = []
+        if playwright_connected:
+            cleanup_steps.append(_close_playwright_browser(session.data.cdp_url))
         if anchor_client and session:
-            anchor_client.sessions.delete(session.data.id)
+            cleanup_steps.append(
+                asyncio.to_thread(anchor_client.sessions.delete, session.data.id)
+            )
+        for cleanup_error in await asyncio.gather(
+            *cleanup_steps, return_exceptions=True
+        ):
+            if isinstance(cleanup_error, Exception):
+                logger.warning("Error deleting browser session: %s", cleanup_error)
+
+        if file_path:
+            cleanup_resume(file_path)
 
-        # Close playwright browser
         try:
-            from .tools.playwright import playwright_browser
+            if session:
+                await anchor_download_replay(anchor_client, user_id, session.data.id)
+        finally:
+            if webhook_task:
+                await webhook_task
 
-            if playwright_browser:
-                print("🔍 Closing playwright browser")
-                await playwright_browser.close()
-                # Reset global variables
-                import server.utils.tools.playwright as playwright_module
+        logger.debug("Cleanup complete for session %s", session_id)
 
-                playwright_module.playwright_browser = None
-                playwright_module.playwright_page = None
-        except Exception as cleanup_error:
-            print(f"⚠️  Error closing playwright browser: {cleanup_error}")
 
-        if file_path:
-            cleanup_resume(file_path)
+@lru_cache(maxsize=1)
+def _find_ffmpeg() -> Optional[str]:
+    """
+    Resolve ffmpeg on PATH once; the install location doesn't change while
+    the server runs, so every replay doesn't need to scan PATH again.
+    """
+    return shutil.which("ffmpeg")
 
-        if session:
-            await anchor_download_replay(anchor_client, user_id, session.data.id)
 
-        print("✅ Cleanup complete")
+async def _close_playwright_browser(cdp_url: str) -> None:
+    """
+    Close the playwright connection a run made to its browser session.
+    """
+    try:
+        logger.debug("Closing playwright browser")
+        await disconnect_playwright(cdp_url)
+    except Exception as cleanup_error:
+        logger.warning("Error closing playwright browser: %s", cleanup_error)
 
 
 async def anchor_download_replay(
@@ -381,85 +519,171 @@ async def anchor_download_replay(
     and uploads the processed clip into R2. Returns the R2 object key:
     '{user_id}/{session_id}.mp4'
     """
-    recording = anchor_client.sessions.recordings.primary.get(session_id)
-    s3 = boto3.client(
-        "s3",
-        endpoint_url=f"https://{ACCOUNT_ID}.r2.cloudflarestorage.com",
-        aws_access_key_id=R2_ACCESS_KEY_ID,
-        aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-        region_name="auto",
+    recording = await asyncio.to_thread(
+        anchor_client.sessions.recordings.primary.get, session_id
     )
+    s3 = get_r2_client()
 
     key = f"{user_id}/{session_id}.mp4"
-    content_type = "video/mp4"
+    metadata = {"user_id": user_id, "session_id": session_id}
 
-    ffmpeg_path = shutil.which("ffmpeg")
+    ffmpeg_path = _find_ffmpeg()
     if not ffmpeg_path:
         raise RuntimeError(
             "ffmpeg is required to process recordings. Please install ffmpeg and ensure it is on PATH."
         )
 
-    CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
-
-    with tempfile.TemporaryDirectory(prefix="stapply-recording-") as temp_dir:
+    # Created and removed in a worker thread, since deleting the recording
+    # would otherwise block the event loop
+    temp_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix="stapply-recording-")
+    try:
         original_path = os.path.join(temp_dir, "original.mp4")
-        processed_path = os.path.join(temp_dir, "processed.mp4")
 
         await asyncio.to_thread(
             _write_recording_to_file,
             recording,
             original_path,
-            CHUNK_SIZE,
+            RECORDING_CHUNK_SIZE,
         )
 
-        await asyncio.to_thread(
-            _process_recording_with_ffmpeg,
-            ffmpeg_path,
-            original_path,
-            processed_path,
-        )
+        # ffmpeg's output is uploaded as it is encoded, so there is no
+        # processed file on disk to write and read back
+        try:
+            await _upload_recording_stream(
+                s3,
+                key,
+                metadata,
+                _stream_ffmpeg_output(
+                    _ffmpeg_command(ffmpeg_path, original_path, with_audio=True)
+                ),
+            )
+        except subprocess.CalledProcessError as exc:
+            if "matches no streams" not in (exc.stderr or ""):
+                raise RuntimeError(
+                    f"ffmpeg failed while processing recording: {(exc.stderr or '').strip()}"
+                ) from exc
+
+            # The recording has no audio track
+            await _upload_recording_stream(
+                s3,
+                key,
+                metadata,
+                _stream_ffmpeg_output(
+                    _ffmpeg_command(ffmpeg_path, original_path, with_audio=False)
+                ),
+            )
 
-        init = await asyncio.to_thread(
-            s3.create_multipart_upload,
-            Bucket=R2_BUCKET,
-            Key=key,
-            ContentType=content_type,
-            Metadata={"user_id": user_id, "session_id": session_id},
-        )
-        upload_id = init["UploadId"]
+        logger.info("Uploaded processed recording to R2 as s3://%s/%s", R2_BUCKET, key)
+        return key
+    finally:
+        await asyncio.to_thread(shutil.rmtree, temp_dir, ignore_errors=True)
 
-        parts = []
-        part_number = 1
 
+async def _upload_recording_stream(
+    s3, key: str, metadata: Dict[str, str], chunks: AsyncIterator[bytes]
+) -> None:
+    """
+    Upload a recording to R2 while it is still being produced.
+
+    Bytes are buffered into RECORDING_CHUNK_SIZE parts. A stream that ends
+    within RECORDING_SINGLE_PUT_THRESHOLD is sent with a single PUT; longer
+    ones switch to a multipart upload whose parts are sent concurrently with
+    the rest of the stream.
+    """
+    buffer = bytearray()
+    upload_id = None
+    part_uploads: list[asyncio.Task] = []
+    # Taken before a part is scheduled, so no more than this many parts are
+    # held in memory waiting on R2
+    upload_slots = asyncio.Semaphore(RECORDING_UPLOAD_CONCURRENCY)
+
+    async def upload_part(part_number: int, body: bytes) -> str:
         try:
-            with open(processed_path, "rb") as processed_file:
-                while True:
-                    chunk = processed_file.read(CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    resp = await asyncio.to_thread(
-                        s3.upload_part,
+            resp = await asyncio.to_thread(
+                s3.upload_part,
+                Bucket=R2_BUCKET,
+                Key=key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                Body=body,
+            )
+            return resp["ETag"]
+        finally:
+            upload_slots.release()
+
+    async def start_part(body: bytes) -> None:
+        await upload_slots.acquire()
+        # Stop reading as soon as a part has failed, rather than finding out
+        # only once the whole stream has been read
+        for part_upload in part_uploads:
+            if part_upload.done() and part_upload.exception():
+                upload_slots.release()
+                raise part_upload.exception()
+        part_uploads.append(
+            asyncio.create_task(upload_part(len(part_uploads) + 1, body))
+        )
+
+    try:
+        async with contextlib.aclosing(chunks):
+            async for data in chunks:
+                buffer += data
+
+                if upload_id is None:
+                    if len(buffer) <= RECORDING_SINGLE_PUT_THRESHOLD:
+                        continue
+                    init = await asyncio.to_thread(
+                        s3.create_multipart_upload,
                         Bucket=R2_BUCKET,
                         Key=key,
-                        PartNumber=part_number,
-                        UploadId=upload_id,
-                        Body=chunk,
+                        ContentType="video/mp4",
+                        Metadata=metadata,
                     )
-                    parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
-                    part_number += 1
+                    upload_id = init["UploadId"]
 
+                while len(buffer) >= RECORDING_CHUNK_SIZE:
+                    await start_part(bytes(buffer[:RECORDING_CHUNK_SIZE]))
+                    del buffer[:RECORDING_CHUNK_SIZE]
+
+        if upload_id is None:
+            # Below this size a single PUT beats the multipart
+            # create/parts/complete round-trips
             await asyncio.to_thread(
-                s3.complete_multipart_upload,
+                s3.put_object,
                 Bucket=R2_BUCKET,
                 Key=key,
-                UploadId=upload_id,
-                MultipartUpload={"Parts": parts},
+                Body=bytes(buffer),
+                ContentType="video/mp4",
+                Metadata=metadata,
             )
+            return
 
-            print(f"Uploaded processed recording to R2 as s3://{R2_BUCKET}/{key}")
-            return key
+        if buffer:
+            await start_part(bytes(buffer))
 
-        except Exception as e:
+        # Part numbers follow scheduling order, and so does gather's result
+        etags = await asyncio.gather(*part_uploads)
+
+        await asyncio.to_thread(
+            s3.complete_multipart_upload,
+            Bucket=R2_BUCKET,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"ETag": etag, "PartNumber": part_number}
+                    for part_number, etag in enumerate(etags, start=1)
+                ]
+            },
+        )
+
+    # BaseException so a cancelled upload (shutdown, cancelled run) is also
+    # aborted, instead of leaving an incomplete multipart upload on R2
+    except BaseException:
+        for part_upload in part_uploads:
+            part_upload.cancel()
+        await asyncio.gather(*part_uploads, return_exceptions=True)
+
+        if upload_id is not None:
             try:
                 await asyncio.to_thread(
                     s3.abort_multipart_upload,
@@ -469,7 +693,50 @@ async def anchor_download_replay(
                 )
             except Exception:
                 pass
-            raise e
+        raise
+
+
+async def _stream_ffmpeg_output(command: list[str]) -> AsyncIterator[bytes]:
+    """
+    Run ffmpeg and yield its stdout as it is produced.
+
+    Raises subprocess.CalledProcessError, with ffmpeg's stderr, if it exits
+    with an error. ffmpeg is killed if the consumer stops early or is
+    cancelled.
+    """
+    # Released on every exit, including errors and cancellation, since the
+    # process is reaped before the block is left
+    async with _ffmpeg_slots:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Drained alongside stdout so ffmpeg never stalls on a full stderr pipe
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            while chunk := await process.stdout.read(RECORDING_CHUNK_SIZE):
+                yield chunk
+            returncode = await process.wait()
+            stderr = (await stderr_task).decode(errors="replace")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                # wait() only returns once both pipes are closed, and a
+                # stdout transport paused on unread output never sees EOF,
+                # so read it to the end before waiting
+                await process.stdout.read()
+                await process.wait()
+            await asyncio.gather(stderr_task, return_exceptions=True)
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
+
+
+def _write_bytes_to_file(destination: str, data: bytes) -> None:
+    with open(destination, "wb") as output_file:
+        output_file.write(data)
 
 
 def _write_recording_to_file(recording, destination: str, chunk_size: int) -> None:
@@ -478,72 +745,38 @@ def _write_recording_to_file(recording, destination: str, chunk_size: int) -> No
             output_file.write(chunk)
 
 
-def _process_recording_with_ffmpeg(
-    ffmpeg_path: str, source: str, destination: str
-) -> None:
-    base_command = [
+def _ffmpeg_command(ffmpeg_path: str, source: str, with_audio: bool) -> list[str]:
+    command = [
         ffmpeg_path,
         "-y",
         "-ss",
         "5",
         "-i",
         source,
+        # Speeding up 4x quadruples the frame rate; capping it drops the
+        # extra frames before libx264 has to encode them
         "-vf",
-        "setpts=0.25*PTS",
-        "-af",
-        "atempo=2,atempo=2",
+        f"setpts=0.25*PTS,fps={RECORDING_FPS}",
+    ]
+    if with_audio:
+        command += ["-af", "atempo=2,atempo=2", "-c:a", "aac"]
+    else:
+        command += ["-an"]
+
+    return command + [
         "-c:v",
         "libx264",
         "-preset",
         "fast",
-        "-c:a",
-        "aac",
+        # +faststart needs a seekable output; a fragmented MP4 can be
+        # written to a pipe and still plays progressively
         "-movflags",
-        "+faststart",
-        destination,
+        "frag_keyframe+empty_moov+default_base_moof",
+        "-f",
+        "mp4",
+        "pipe:1",
     ]
 
-    try:
-        subprocess.run(
-            base_command,
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-    except subprocess.CalledProcessError as exc:
-        if "matches no streams" in (exc.stderr or ""):
-            fallback_command = [
-                ffmpeg_path,
-                "-y",
-                "-ss",
-                "5",
-                "-i",
-                source,
-                "-vf",
-                "setpts=0.25*PTS",
-                "-an",
-                "-c:v",
-                "libx264",
-                "-preset",
-                "fast",
-                "-movflags",
-                "+faststart",
-                destination,
-            ]
-            subprocess.run(
-                fallback_command,
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            return
-
-        raise RuntimeError(
-            f"ffmpeg failed while processing recording: {(exc.stderr or '').strip()}"
-        ) from exc
-
 
 if __name__ == "__main__":
     # Run the advanced integration demo
@@ -0,0 +1,43 @@
+"""
+Shared aiohttp client session.
+
+A single ClientSession keeps one connection pool for the whole process, so
+repeated requests to the same host reuse TCP/TLS connections instead of
+paying a new handshake every time.
+"""
+
+from typing import Optional
+
+import aiohttp
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide aiohttp session, creating it on first use.
+
+    Must be called from within a running event loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=50,
+                limit_per_host=10,
+                keepalive_timeout=60,
+                # Webhooks go to a handful of hosts; resolving them every 10s
+                # (the default) only adds lookups when many runs finish at once
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _session
+
+
+async def close_http_session() -> None:
+    """Close the shared session if it was created."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
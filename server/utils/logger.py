@@ -0,0 +1,57 @@
+"""
+Non-blocking logging setup.
+
+Records are put on an in-memory queue by a QueueHandler on the calling thread,
+and formatted and written by a background QueueListener, so logging from the
+event loop never waits on stdout/stderr.
+"""
+
+import logging
+import logging.handlers
+import queue
+
+from ..config import get_settings
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+)
+_listener = logging.handlers.QueueListener(_queue, _stream_handler)
+_listener_running = False
+
+_root_logger = logging.getLogger("stapply")
+_root_logger.setLevel(get_settings().log_level)
+_root_logger.addHandler(logging.handlers.QueueHandler(_queue))
+_root_logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger that writes through the shared background queue.
+
+    Args:
+        name: Short component name, e.g. "browser"
+
+    Returns:
+        Logger under the "stapply" namespace
+    """
+    start_logging()
+    return _root_logger.getChild(name)
+
+
+def start_logging() -> None:
+    """Start the background listener if it is not already running."""
+    global _listener_running
+    if not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def stop_logging() -> None:
+    """Flush pending records and stop the background listener."""
+    global _listener_running
+    if _listener_running:
+        _listener.stop()
+        _listener_running = False
@@ -1,4 +1,4 @@
-import json
+import orjson
 
 default_profile = {
     "name": "Thomas Mueller",
@@ -37,4 +37,4 @@ default_profile = {
     ],
 }
 
-default_profile_json = json.dumps(default_profile, indent=4)
+default_profile_json = orjson.dumps(default_profile).decode()
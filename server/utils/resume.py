@@ -1,54 +1,96 @@
+import mimetypes
 import os
 import uuid
-import requests
+from urllib.parse import urlparse
 
+import aiohttp
 from dotenv import load_dotenv
 
+from .http import get_http_session
+from .logger import get_logger
+
 load_dotenv()
 
+logger = get_logger("resume")
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 64 KiB
+
+# Go up from utils directory to server directory, then to uploads. Created
+# once here instead of on every download
+UPLOADS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+
+# Resume formats kept as-is; anything else is saved as .pdf
+RESUME_EXTENSIONS = {".pdf", ".doc", ".docx"}
+
+
+def _resume_extension(resume_url: str, content_type: str) -> str:
+    """
+    Pick the resume's file extension from the URL path, ignoring any query
+    string (e.g. signed URLs), then from the response Content-Type.
+    Defaults to .pdf.
+    """
+    file_ext = os.path.splitext(urlparse(resume_url).path)[1].lower()
+    if file_ext in RESUME_EXTENSIONS:
+        return file_ext
+
+    file_ext = mimetypes.guess_extension(content_type)
+    if file_ext in RESUME_EXTENSIONS:
+        return file_ext
 
-def download_resume(resume_url: str) -> str:
+    return ".pdf"
+
+
+async def download_resume(resume_url: str) -> str:
     """
     Download resume from URL and save it to uploads directory with a unique ID.
+    The body is streamed to disk in chunks rather than buffered in memory.
     Returns the local file path.
     """
+    local_path = None
     try:
-        # Create uploads directory if it doesn't exist
-        # Go up from utils directory to server directory, then to uploads
-        server_dir = os.path.dirname(os.path.dirname(__file__))
-        uploads_dir = os.path.join(server_dir, "uploads")
-        os.makedirs(uploads_dir, exist_ok=True)
-
         # Generate unique ID for the file
-        file_id = str(uuid.uuid4())
-
-        # Get file extension from URL or default to .pdf
-        if resume_url.lower().endswith(".pdf"):
-            file_ext = ".pdf"
-        elif resume_url.lower().endswith(".doc"):
-            file_ext = ".doc"
-        elif resume_url.lower().endswith(".docx"):
-            file_ext = ".docx"
-        else:
-            file_ext = ".pdf"  # Default to PDF
-
-        # Create local file path
-        local_filename = f"{file_id}{file_ext}"
-        local_path = os.path.join(uploads_dir, local_filename)
-
-        # Download the file
-        response = requests.get(resume_url, timeout=30)
-        response.raise_for_status()
-
-        # Save the file
-        with open(local_path, "wb") as f:
-            f.write(response.content)
-
-        print(f"✅ Resume downloaded: {local_path}")
+        file_id = uuid.uuid4().hex
+
+        # Download the file and stream it to disk
+        session = get_http_session()
+        async with session.get(
+            resume_url, timeout=aiohttp.ClientTimeout(total=30)
+        ) as response:
+            response.raise_for_status()
+
+            # Decided once the headers are in, so falling back to the
+            # Content-Type costs no extra request
+            file_ext = _resume_extension(resume_url, response.content_type)
+
+            # Create local file path
+            local_filename = f"{file_id}{file_ext}"
+            local_path = os.path.join(UPLOADS_DIR, local_filename)
+
+            # Unbuffered writes straight to the fd, since every chunk is
+            # already a full buffer; owner-only, as resumes are personal data
+            fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                async for chunk in response.content.iter_chunked(
+                    DOWNLOAD_CHUNK_SIZE
+                ):
+                    # os.write may write less than asked, so keep going
+                    # until the whole chunk is on disk
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(fd, view) :]
+            finally:
+                os.close(fd)
+
+        logger.info("Resume downloaded: %s", local_path)
         return local_path
 
-    except Exception as e:
-        print(f"❌ Failed to download resume: {str(e)}")
+    except BaseException as e:
+        logger.error("Failed to download resume: %s", e)
+        # Don't leave a partially streamed file behind, including when the
+        # download is cancelled
+        if local_path and os.path.exists(local_path):
+            os.remove(local_path)
         raise
 
 
@@ -59,6 +101,6 @@ def cleanup_resume(file_path: str):
     try:
         if os.path.exists(file_path):
             os.remove(file_path)
-            print(f"🗑️  Resume file cleaned up: {file_path}")
+            logger.debug("Resume file cleaned up: %s", file_path)
     except Exception as e:
-        print(f"⚠️  Failed to cleanup resume file: {str(e)}")
+        logger.warning("Failed to cleanup resume file: %s", e)
@@ -0,0 +1,23 @@
+"""
+Cached UTC timestamp formatting.
+
+Responses only need second resolution, so the formatted string is rebuilt at
+most once per second instead of on every call.
+"""
+
+import time
+from datetime import datetime, timezone
+
+_iso_cache = {"sec": -1, "iso": ""}
+
+
+def iso_now() -> str:
+    """
+    Current UTC time as an ISO 8601 string, e.g. "2025-01-01T12:00:00+00:00".
+    """
+    sec = int(time.time())
+    cache = _iso_cache
+    if cache["sec"] != sec:
+        cache["iso"] = datetime.fromtimestamp(sec, tz=timezone.utc).isoformat()
+        cache["sec"] = sec
+    return cache["iso"]
@@ -3,16 +3,33 @@ Webhook signature verification utilities.
 
 This module provides functions to verify webhook signatures sent by the agent.
 Use these functions in your webhook endpoint to ensure the request is legitimate.
+
+Always verify against the raw request body exactly as received. Payload keys are
+not sorted, so re-serializing the parsed JSON will not reproduce the signed bytes.
 """
 
 import hmac
 import hashlib
 import time
+from functools import lru_cache
 from typing import Optional
 
 
+# "sha256=" followed by the 64 hex characters of a SHA-256 digest
+SIGNATURE_LENGTH = len("sha256=") + 64
+
+
+@lru_cache(maxsize=1)
+def hmac_template(secret: bytes) -> hmac.HMAC:
+    """
+    Keyed HMAC-SHA256 state for a secret. Copying it skips re-deriving the
+    padded inner/outer keys on every signature or verification.
+    """
+    return hmac.new(secret, digestmod=hashlib.sha256)
+
+
 def verify_webhook_signature(
-    payload: str,
+    payload: bytes | str,
     signature: str,
     secret: str,
     timestamp: Optional[str] = None,
@@ -22,7 +39,7 @@ def verify_webhook_signature(
     Verify webhook signature to ensure request authenticity.
 
     Args:
-        payload: The raw request body as string
+        payload: The raw request body, preferably the bytes as received
         signature: The signature from X-Webhook-Signature header (format: sha256=...)
         secret: The webhook secret key
         timestamp: The timestamp from X-Webhook-Timestamp header
@@ -51,12 +68,23 @@ def verify_webhook_signature(
         print("Invalid signature format")
         return False
 
-    expected_signature = signature[7:]  # Remove "sha256=" prefix
+    # A SHA-256 signature is 64 hex characters; reject anything else before
+    # hashing a potentially large payload
+    if len(signature) != SIGNATURE_LENGTH:
+        print("Invalid signature format")
+        return False
+
+    # Remove "sha256=" prefix and compare raw digests rather than hex strings
+    try:
+        expected_signature = bytes.fromhex(signature[7:])
+    except ValueError:
+        print("Invalid signature format")
+        return False
 
     # Generate expected signature
-    computed_signature = hmac.new(
-        secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256
-    ).hexdigest()
+    mac = hmac_template(secret.encode("utf-8")).copy()
+    mac.update(payload if isinstance(payload, bytes) else payload.encode("utf-8"))
+    computed_signature = mac.digest()
 
     # Use constant-time comparison to prevent timing attacks
     is_valid = hmac.compare_digest(expected_signature, computed_signature)
@@ -68,7 +96,7 @@ def verify_webhook_signature(
 
 
 def verify_webhook_request(
-    request_body: str,
+    request_body: bytes | str,
     signature_header: str,
     timestamp_header: str,
     secret: str,
@@ -78,7 +106,7 @@ def verify_webhook_request(
     Verify a complete webhook request.
 
     Args:
-        request_body: The raw request body
+        request_body: The raw request body (e.g. await request.body())
         signature_header: The X-Webhook-Signature header value
         timestamp_header: The X-Webhook-Timestamp header value
         secret: The webhook secret key
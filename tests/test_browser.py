@@ -0,0 +1,195 @@
+import asyncio
+import contextlib
+import subprocess
+import sys
+import time
+import unittest
+from unittest import mock
+
+from server.utils import browser
+
+
+class FakeS3:
+    """Records the R2 calls made by an upload; fails upload_part on request."""
+
+    def __init__(self, fail_part: int | None = None):
+        self.fail_part = fail_part
+        self.calls = []
+
+    def put_object(self, **kwargs):
+        self.calls.append("put_object")
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append("create_multipart_upload")
+        return {"UploadId": "upload"}
+
+    def upload_part(self, **kwargs):
+        self.calls.append("upload_part")
+        if kwargs["PartNumber"] == self.fail_part:
+            raise RuntimeError("upload failed")
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.calls.append("complete_multipart_upload")
+
+    def abort_multipart_upload(self, **kwargs):
+        self.calls.append("abort_multipart_upload")
+
+
+def python_command(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+class UploadRecordingStreamTests(unittest.IsolatedAsyncioTestCase):
+    async def test_failure_mid_stream_aborts_upload_and_closes_stream(self):
+        closed = asyncio.Event()
+
+        async def chunks():
+            try:
+                while True:
+                    yield b"x" * browser.RECORDING_CHUNK_SIZE
+            finally:
+                closed.set()
+
+        s3 = FakeS3(fail_part=1)
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(
+                browser._upload_recording_stream(s3, "key", {}, chunks()), 5
+            )
+
+        self.assertTrue(closed.is_set())
+        self.assertIn("abort_multipart_upload", s3.calls)
+        self.assertNotIn("complete_multipart_upload", s3.calls)
+
+    async def test_cancel_mid_stream_aborts_upload(self):
+        part_started = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        class SlowS3(FakeS3):
+            def upload_part(self, **kwargs):
+                loop.call_soon_threadsafe(part_started.set)
+                time.sleep(0.2)
+                return super().upload_part(**kwargs)
+
+        async def chunks():
+            while True:
+                yield b"x" * browser.RECORDING_CHUNK_SIZE
+
+        s3 = SlowS3()
+        upload = asyncio.create_task(
+            browser._upload_recording_stream(s3, "key", {}, chunks())
+        )
+        await asyncio.wait_for(part_started.wait(), 5)
+        upload.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(upload, 5)
+
+        self.assertIn("abort_multipart_upload", s3.calls)
+        self.assertNotIn("complete_multipart_upload", s3.calls)
+
+    async def test_small_recording_uses_single_put(self):
+        s3 = FakeS3()
+        await browser._upload_recording_stream(
+            s3,
+            "key",
+            {},
+            browser._stream_ffmpeg_output(
+                python_command("import sys; sys.stdout.buffer.write(b'x' * 1024)")
+            ),
+        )
+
+        self.assertEqual(s3.calls, ["put_object"])
+
+
+class StreamFfmpegOutputTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.processes = []
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        async def spawn(*args, **kwargs):
+            process = await create_subprocess_exec(*args, **kwargs)
+            self.processes.append(process)
+            return process
+
+        patcher = mock.patch("asyncio.create_subprocess_exec", spawn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_error_exit_raises_with_stderr(self):
+        command = python_command(
+            "import sys; sys.stderr.write('matches no streams'); sys.exit(1)"
+        )
+        with self.assertRaises(subprocess.CalledProcessError) as raised:
+            async for _ in browser._stream_ffmpeg_output(command):
+                pass
+
+        self.assertEqual(raised.exception.returncode, 1)
+        self.assertIn("matches no streams", raised.exception.stderr)
+
+    async def test_consumer_error_mid_stream_kills_ffmpeg(self):
+        # Keeps writing, so unread output is queued when the consumer stops
+        command = python_command(
+            "import sys\nwhile True: sys.stdout.buffer.write(b'x' * 65536)"
+        )
+
+        async def consume():
+            stream = browser._stream_ffmpeg_output(command)
+            async with contextlib.aclosing(stream):
+                async for _ in stream:
+                    await asyncio.sleep(0.1)
+                    raise ValueError("upload failed")
+
+        with self.assertRaises(ValueError):
+            await asyncio.wait_for(consume(), 5)
+
+        self.assertIsNotNone(self.processes[0].returncode)
+        self.assertEqual(browser._ffmpeg_slots._value, browser.FFMPEG_CONCURRENCY)
+
+    async def test_cancel_kills_ffmpeg(self):
+        # Fills the stderr pipe, then hangs like a stuck encode
+        command = python_command(
+            "import sys, time; sys.stderr.write('x' * (1 << 20)); time.sleep(60)"
+        )
+
+        async def consume():
+            async for _ in browser._stream_ffmpeg_output(command):
+                pass
+
+        run = asyncio.create_task(consume())
+        while not self.processes:
+            await asyncio.sleep(0.01)
+        run.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(run, 5)
+
+        self.assertIsNotNone(self.processes[0].returncode)
+        self.assertEqual(browser._ffmpeg_slots._value, browser.FFMPEG_CONCURRENCY)
+
+
+class AnchorDownloadReplayTests(unittest.IsolatedAsyncioTestCase):
+    async def test_ffmpeg_slot_released_after_failed_upload(self):
+        recording = mock.Mock()
+        recording.iter_bytes.return_value = [b"recording"]
+        anchor_client = mock.Mock()
+        anchor_client.sessions.recordings.primary.get.return_value = recording
+
+        def ffmpeg_command(ffmpeg_path, source, with_audio):
+            # Stands in for an encode big enough to need a multipart upload
+            size = browser.RECORDING_SINGLE_PUT_THRESHOLD + 1
+            return python_command(f"import sys; sys.stdout.buffer.write(b'x' * {size})")
+
+        s3 = FakeS3(fail_part=1)
+        with (
+            mock.patch.object(browser, "get_r2_client", return_value=s3),
+            mock.patch.object(browser, "_find_ffmpeg", return_value="ffmpeg"),
+            mock.patch.object(browser, "_ffmpeg_command", ffmpeg_command),
+        ):
+            with self.assertRaises(RuntimeError):
+                await browser.anchor_download_replay(anchor_client, "user", "session")
+
+        self.assertIn("abort_multipart_upload", s3.calls)
+        self.assertEqual(browser._ffmpeg_slots._value, browser.FFMPEG_CONCURRENCY)
+
+
+if __name__ == "__main__":
+    unittest.main()